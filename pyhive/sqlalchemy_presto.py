@@ -7,15 +7,15 @@ which is released under the MIT license.
 
 from __future__ import absolute_import
 from __future__ import unicode_literals
-from distutils.version import StrictVersion
 from pyhive import presto
 from sqlalchemy import exc
 from sqlalchemy import types
 from sqlalchemy import util
 from sqlalchemy.engine import default
 from sqlalchemy.sql import compiler
-import re
+import collections
 import sqlalchemy
+import weakref
 
 
 class PrestoIdentifierPreparer(compiler.IdentifierPreparer):
@@ -113,6 +113,26 @@ _type_map = {
     'varchar': types.String,
 }
 
+# Presto's error for SHOW COLUMNS on a missing table is "Table '<qualified name>' does not exist"
+_TABLE_MISSING_PREFIX = "Table '"
+_TABLE_MISSING_SUFFIX = "' does not exist"
+
+# Max number of tables whose metadata is remembered per connection
+_COLUMN_CACHE_SIZE = 512
+
+# What a single SHOW COLUMNS tells us about a table
+_TableMeta = collections.namedtuple('_TableMeta', ['rows', 'partition_cols'])
+
+# Statements that can't change table metadata. Anything else clears the connection's table cache.
+_READ_ONLY_STATEMENTS = ('SELECT', 'SHOW', 'WITH', 'DESCRIBE', 'EXPLAIN')
+
+
+def _dbapi_connection(connection):
+    """Unwrap SQLAlchemy connection proxies to get at the underlying presto.Connection"""
+    while connection is not None and not isinstance(connection, presto.Connection):
+        connection = getattr(connection, 'connection', None)
+    return connection
+
 
 class PrestoDialect(default.DefaultDialect):
     name = 'presto'
@@ -126,34 +146,54 @@ class PrestoDialect(default.DefaultDialect):
     supports_unicode_binds = True
     returns_unicode_strings = True
     description_encoding = None
+    supports_statement_cache = True
+
+    def __init__(self, *args, **kwargs):
+        super(PrestoDialect, self).__init__(*args, **kwargs)
+        # presto.Connection -> {(schema, table_name): _TableMeta}, least recently used first.
+        # Entries go away when the connection runs anything but a read, commits, rolls back (e.g. on
+        # return to the pool) or gets garbage collected.
+        self._column_cache = weakref.WeakKeyDictionary()
 
     @classmethod
     def dbapi(cls):
         return presto
 
     def create_connect_args(self, url):
-        db_parts = url.database.split('/')
+        catalog, sep, schema = url.database.partition('/')
+        if '/' in schema:
+            raise ValueError("Unexpected database format %s" % url.database)
         kwargs = {
             'host': url.host,
             'port': url.port,
             'username': url.username,
         }
         kwargs.update(url.query)
-        if len(db_parts) == 1:
-            kwargs['catalog'] = db_parts[0]
-        elif len(db_parts) == 2:
-            kwargs['catalog'] = db_parts[0]
-            kwargs['schema'] = db_parts[1]
-        else:
-            raise ValueError("Unexpected database format {}".format(url.database))
+        kwargs['catalog'] = catalog
+        if sep:
+            kwargs['schema'] = schema
         return ([], kwargs)
 
+    def _get_column_cache(self, connection):
+        dbapi_connection = _dbapi_connection(connection)
+        if dbapi_connection is None:
+            return None
+        return self._column_cache.setdefault(dbapi_connection, collections.OrderedDict())
+
+    def _cache_table(self, cache, key, table):
+        if cache is not None:
+            cache[key] = table
+            if len(cache) > _COLUMN_CACHE_SIZE:
+                cache.popitem(last=False)
+
     def _get_table_columns(self, connection, table_name, schema):
-        full_table = self.identifier_preparer.quote_identifier(table_name)
+        quote = self.identifier_preparer.quote_identifier
         if schema:
-            full_table = self.identifier_preparer.quote_identifier(schema) + '.' + full_table
+            full_table = '.'.join((quote(schema), quote(table_name)))
+        else:
+            full_table = quote(table_name)
         try:
-            return connection.execute('SHOW COLUMNS FROM {}'.format(full_table))
+            result = connection.execute('SHOW COLUMNS FROM {}'.format(full_table))
         except presto.DatabaseError as e:
             # Normally SQLAlchemy should wrap this exception in sqlalchemy.exc.DatabaseError, which
             # it successfully does in the Hive version. The difference with Presto is that this
@@ -162,28 +202,53 @@ class PrestoDialect(default.DefaultDialect):
             # presto.DatabaseError here.
             # Does the table exist?
             msg = e.message.get('message') if isinstance(e.message, dict) else None
-            regex = r"^Table\ \'.*{}\'\ does\ not\ exist$".format(re.escape(table_name))
-            if msg and re.match(regex, msg):
-                raise exc.NoSuchTableError(table_name)
-            else:
-                raise
-
-    def has_table(self, connection, table_name, schema=None):
+            is_missing_table_error = (
+                msg
+                and msg.startswith(_TABLE_MISSING_PREFIX)
+                and msg.endswith(_TABLE_MISSING_SUFFIX)
+            )
+            if is_missing_table_error:
+                missing_table = msg[len(_TABLE_MISSING_PREFIX):-len(_TABLE_MISSING_SUFFIX)]
+                if missing_table.rsplit('.', 1)[-1] == table_name:
+                    raise exc.NoSuchTableError(table_name)
+            raise
         try:
-            self._get_table_columns(connection, table_name, schema)
-            return True
-        except exc.NoSuchTableError:
-            return False
+            return result.fetchall()
+        finally:
+            result.close()
 
-    def get_columns(self, connection, table_name, schema=None, **kw):
-        rows = self._get_table_columns(connection, table_name, None)
+    def _reflect_table(self, connection, table_name, schema):
+        """Everything reflection needs to know about a table, from a single ``SHOW COLUMNS``.
+
+        The result is cached on the connection, so ``has_table``, ``get_columns`` and
+        ``get_indexes`` for the same table only query Presto once. Missing tables raise
+        ``NoSuchTableError`` and aren't cached, since they may get created any moment.
+        """
+        cache = self._get_column_cache(connection)
+        key = (schema, table_name)
+        if cache is not None and key in cache:
+            # Move to the end so that eviction drops the least recently used table
+            table = cache.pop(key)
+            cache[key] = table
+            return table
+        rows = self._get_table_columns(connection, table_name, schema)
+        # SHOW COLUMNS gives back name, type, nullable, partition key
+        table = _TableMeta(rows, [row[0] for row in rows if row[3]])
+        self._cache_table(cache, key, table)
+        return table
+
+    def _clear_column_cache(self, dbapi_connection):
+        dbapi_connection = _dbapi_connection(dbapi_connection)
+        if dbapi_connection is not None:
+            self._column_cache.pop(dbapi_connection, None)
+
+    def _get_column_info(self, rows):
         result = []
         for row in rows:
-            name, coltype, nullable, _is_partition_key = row
-            try:
-                coltype = _type_map[coltype]
-            except KeyError:
-                util.warn("Did not recognize type '%s' of column '%s'" % (coltype, name))
+            name, type_name, nullable, _is_partition_key = row
+            coltype = _type_map.get(type_name)
+            if coltype is None:
+                util.warn("Did not recognize type '%s' of column '%s'" % (type_name, name))
                 coltype = types.NullType
             result.append({
                 'name': name,
@@ -193,6 +258,17 @@ class PrestoDialect(default.DefaultDialect):
             })
         return result
 
+    def has_table(self, connection, table_name, schema=None):
+        try:
+            self._reflect_table(connection, table_name, schema)
+            return True
+        except exc.NoSuchTableError:
+            return False
+
+    def get_columns(self, connection, table_name, schema=None, **kw):
+        table = self._reflect_table(connection, table_name, schema)
+        return self._get_column_info(table.rows)
+
     def get_foreign_keys(self, connection, table_name, schema=None, **kw):
         # Hive has no support for foreign keys.
         return []
@@ -202,25 +278,43 @@ class PrestoDialect(default.DefaultDialect):
         return []
 
     def get_indexes(self, connection, table_name, schema=None, **kw):
-        rows = self._get_table_columns(connection, table_name, None)
-        col_names = []
-        for row in rows:
-            if row['Partition Key']:
-                col_names.append(row['Column'])
-        if col_names:
+        table = self._reflect_table(connection, table_name, schema)
+        if table.partition_cols:
+            col_names = list(table.partition_cols)
             return [{'name': 'partition', 'column_names': col_names, 'unique': False}]
         else:
             return []
 
     def get_table_names(self, connection, schema=None, **kw):
-        query = 'SHOW TABLES'
         if schema:
-            query += ' FROM ' + self.identifier_preparer.quote_identifier(schema)
+            query = 'SHOW TABLES FROM {}'.format(self.identifier_preparer.quote_identifier(schema))
+        else:
+            query = 'SHOW TABLES'
         return [row.tab_name for row in connection.execute(query)]
 
+    def _clear_column_cache_after(self, statement, context):
+        # DDL (or anything else that isn't a plain read) may change what reflection would see
+        if context is not None and not statement.lstrip()[:8].upper().startswith(
+                _READ_ONLY_STATEMENTS):
+            self._clear_column_cache(context.root_connection)
+
+    def do_execute(self, cursor, statement, parameters, context=None):
+        super(PrestoDialect, self).do_execute(cursor, statement, parameters, context)
+        self._clear_column_cache_after(statement, context)
+
+    def do_execute_no_params(self, cursor, statement, context=None):
+        super(PrestoDialect, self).do_execute_no_params(cursor, statement, context)
+        self._clear_column_cache_after(statement, context)
+
+    def do_commit(self, dbapi_connection):
+        # DDL autocommits, so forget any table metadata seen through this connection
+        self._clear_column_cache(dbapi_connection)
+        super(PrestoDialect, self).do_commit(dbapi_connection)
+
     def do_rollback(self, dbapi_connection):
-        # No transactions for Presto
-        pass
+        # No transactions for Presto, but the pool rolls back on checkin. Use that as the end of
+        # the column cache's lifetime.
+        self._clear_column_cache(dbapi_connection)
 
     def _check_unicode_returns(self, connection, additional_tests=None):
         # requests gives back Unicode strings
@@ -230,7 +324,7 @@ class PrestoDialect(default.DefaultDialect):
         # requests gives back Unicode strings
         return True
 
-if StrictVersion(sqlalchemy.__version__) < StrictVersion('0.6.0'):
+if tuple(int(x) for x in sqlalchemy.__version__.split('.')[:2]) < (0, 6):
     from pyhive import sqlalchemy_backports
 
     def reflecttable(self, connection, table, include_columns=None, exclude_columns=None):
@@ -1,13 +1,16 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+from pyhive import presto
 from pyhive.tests.sqlachemy_test_case import SqlAlchemyTestCase
 from pyhive.tests.sqlachemy_test_case import with_engine_connection
 from sqlalchemy.engine import create_engine
+from sqlalchemy.engine.url import make_url
 from sqlalchemy.schema import Column
 from sqlalchemy.schema import MetaData
 from sqlalchemy.schema import Table
 from sqlalchemy.types import String
 import contextlib
+import mock
 import unittest
 
 
@@ -42,6 +45,47 @@ class TestSqlAlchemyPresto(unittest.TestCase, SqlAlchemyTestCase):
             #0.1,
         ])
 
+    @with_engine_connection
+    def test_has_table(self, engine, connection):
+        self.assertTrue(engine.dialect.has_table(connection, 'one_row'))
+        self.assertTrue(engine.dialect.has_table(connection, 'one_row', schema='default'))
+        self.assertFalse(engine.dialect.has_table(connection, 'this_does_not_exist'))
+
+    def _mock_connection(self):
+        connection = mock.Mock()
+        connection.connection = presto.Connection('localhost')
+        connection.execute.return_value.fetchall.return_value = [('a', 'bigint', True, False)]
+        return connection
+
+    def test_table_cache_cleared_by_ddl(self):
+        dialect = create_engine('presto://localhost:8080/hive').dialect
+        connection = self._mock_connection()
+        context = mock.Mock(root_connection=connection)
+        self.assertTrue(dialect.has_table(connection, 'foo'))
+        self.assertEqual(dialect.get_columns(connection, 'foo')[0]['name'], 'a')
+        self.assertEqual(connection.execute.call_count, 1)
+        # Reads keep the cache
+        dialect.do_execute(mock.Mock(), 'SELECT * FROM foo', {}, context)
+        dialect.do_execute_no_params(mock.Mock(), ' show tables', context)
+        self.assertTrue(dialect.has_table(connection, 'foo'))
+        self.assertEqual(connection.execute.call_count, 1)
+        # DDL clears it
+        dialect.do_execute_no_params(mock.Mock(), 'DROP TABLE foo', context)
+        self.assertTrue(dialect.has_table(connection, 'foo'))
+        self.assertEqual(connection.execute.call_count, 2)
+
+    def test_missing_table_not_cached(self):
+        dialect = create_engine('presto://localhost:8080/hive').dialect
+        connection = self._mock_connection()
+        result = connection.execute.return_value
+        connection.execute.side_effect = [
+            presto.DatabaseError({'message': "Table 'hive.default.foo' does not exist"}),
+            result,
+        ]
+        self.assertFalse(dialect.has_table(connection, 'foo'))
+        self.assertTrue(dialect.has_table(connection, 'foo'))
+        self.assertEqual(connection.execute.call_count, 2)
+
     def test_url_default(self):
         engine = create_engine('presto://localhost:8080/hive')
         try:
@@ -50,6 +94,27 @@ class TestSqlAlchemyPresto(unittest.TestCase, SqlAlchemyTestCase):
         finally:
             engine.dispose()
 
+    def test_create_connect_args(self):
+        dialect = create_engine('presto://localhost:8080/hive').dialect
+        _args, kwargs = dialect.create_connect_args(make_url('presto://localhost:8080/hive'))
+        self.assertEqual(kwargs['catalog'], 'hive')
+        self.assertNotIn('schema', kwargs)
+        _args, kwargs = dialect.create_connect_args(
+            make_url('presto://localhost:8080/hive/default?source=foo'))
+        self.assertEqual(kwargs['catalog'], 'hive')
+        self.assertEqual(kwargs['schema'], 'default')
+        self.assertEqual(kwargs['source'], 'foo')
+        self.assertRaises(ValueError, lambda: dialect.create_connect_args(
+            make_url('presto://localhost:8080/hive/default/extra')))
+
+    def test_quote(self):
+        preparer = create_engine('presto://localhost:8080/hive').dialect.identifier_preparer
+        self.assertEqual(preparer.quote('foo_bar'), 'foo_bar')
+        self.assertEqual(preparer.quote('select'), '"select"')
+        self.assertEqual(preparer.quote('Select'), '"Select"')
+        self.assertEqual(preparer.quote('1foo'), '"1foo"')
+        self.assertEqual(preparer.quote('foo-bar'), '"foo-bar"')
+
     @with_engine_connection
     def test_reserved_words(self, engine, connection):
         """Presto uses double quotes, not backticks"""